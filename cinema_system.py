@@ -1,5 +1,15 @@
+import bisect
+import heapq
 import json
+import mmap
 import os
+import queue
+import struct
+import threading
+from collections import deque, namedtuple
+from itertools import islice, repeat
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta
 from docx import Document
 from docx.shared import Pt, RGBColor, Inches
@@ -15,10 +25,354 @@ from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor as PptxRGBColor
 
 
+STORAGE_FORMATS = ("json", "compact", "binary")
+STORAGE_EXTENSIONS = {"json": ".json", "compact": ".json", "binary": ".bin"}
+BINARY_MAGIC = b"KTB1"
+SCHEDULE_INDEX_EXTENSION = ".idx"
+SEAT_STORES = ("inline", "mmap")
+
+TIME_INTERVALS = {
+    "Утро (6-12)": (6, 12),
+    "День (12-18)": (12, 18),
+    "Вечер (18-22)": (18, 22),
+    "Ночь (22-6)": (22, 6)
+}
+
+DEFAULT_BASE_PRICE = 350
+DEFAULT_ZONE_MULTIPLIERS = [0.8, 1.2, 1.0]
+TIME_INTERVAL_MULTIPLIERS = {
+    "Утро (6-12)": 0.7,
+    "День (12-18)": 1.0,
+    "Вечер (18-22)": 1.3,
+    "Ночь (22-6)": 0.9
+}
+SURGE_TIERS = ((0.8, 1.3), (0.5, 1.15))
+
+EVENT_THEATRE_ADDED = "theatre_added"
+EVENT_HALL_ADDED = "hall_added"
+EVENT_SESSION_CREATED = "session_created"
+EVENT_TICKET_SOLD = "ticket_sold"
+
+Event = namedtuple("Event", ["type", "timestamp", "data"])
+
+
+def _time_interval(hour):
+    for interval_name, (start_h, end_h) in TIME_INTERVALS.items():
+        if start_h < end_h:
+            if start_h <= hour < end_h:
+                return interval_name
+        else:
+            if hour >= start_h or hour < end_h:
+                return interval_name
+    return None
+
+
+def _session_pricing(start_time, base_price=DEFAULT_BASE_PRICE):
+    try:
+        hour = datetime.strptime(start_time, "%Y-%m-%d %H:%M").hour
+        slot = TIME_INTERVAL_MULTIPLIERS[_time_interval(hour)]
+    except ValueError:
+        slot = 1.0
+
+    return {
+        "base": base_price,
+        "zones": list(DEFAULT_ZONE_MULTIPLIERS),
+        "slot": slot
+    }
+
+
+def _encode_theatre(data, storage_format):
+    if storage_format == "json":
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+    if storage_format == "compact":
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    header = dict(data)
+    header["halls"] = []
+    seat_sections = []
+    for hall in data["halls"]:
+        hall_header = dict(hall)
+        hall_header["sessions"] = []
+        for session in hall["sessions"]:
+            session_header = {key: value for key, value in session.items() if key != "seats"}
+            hall_header["sessions"].append(session_header)
+            for row in session.get("seats", []):
+                seat_sections.append(bytes(row))
+        header["halls"].append(hall_header)
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return BINARY_MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes + b"".join(seat_sections)
+
+
+def _unpack_seats(buffer, offset, rows, seats_per_row):
+    if rows * seats_per_row == 0:
+        return [[] for _ in range(rows)]
+
+    with memoryview(buffer) as view, \
+            view[offset:offset + rows * seats_per_row] as region, \
+            region.cast('?', (rows, seats_per_row)) as seats:
+        return seats.tolist()
+
+
+def _decode_theatre(raw):
+    if not raw.startswith(BINARY_MAGIC):
+        data = json.loads(raw.decode('utf-8'))
+        data.setdefault("storage_format", "json")
+        return data
+
+    offset = len(BINARY_MAGIC)
+    (header_length,) = struct.unpack_from("<I", raw, offset)
+    offset += 4
+    data = json.loads(raw[offset:offset + header_length].decode('utf-8'))
+    data.setdefault("storage_format", "binary")
+    offset += header_length
+
+    if data.get("seat_store") == "mmap":
+        return data
+
+    for hall in data["halls"]:
+        rows = hall["rows"]
+        seats_per_row = hall["seats_per_row"]
+        for session in hall["sessions"]:
+            session["seats"] = _unpack_seats(raw, offset, rows, seats_per_row)
+            offset += rows * seats_per_row
+    return data
+
+
+def _seat_map_path(directory, theatre_name, hall_number):
+    return os.path.join(directory, f"{theatre_name}.hall{hall_number}.seats")
+
+
+def _count_sold(data, directory, hall, session_index):
+    if data.get("seat_store") != "mmap":
+        return sum(map(list.count, hall["sessions"][session_index]["seats"], repeat(True)))
+
+    size = hall["rows"] * hall["seats_per_row"]
+    if size == 0:
+        return 0
+    with open(_seat_map_path(directory, data["name"], hall["number"]), 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as seat_map, \
+            memoryview(seat_map) as view, \
+            view[session_index * size:(session_index + 1) * size] as region:
+        return sum(region)
+
+
+def _verify_counters(data, directory, recount=False):
+    theatre_sold = 0
+    theatre_total = 0
+    for hall in data["halls"]:
+        hall_sold = 0
+        hall_total = 0
+        session_total = hall["rows"] * hall["seats_per_row"]
+        for session_index, session in enumerate(hall["sessions"]):
+            sold = session.get("sold")
+            if (recount or session.get("total") != session_total
+                    or not isinstance(sold, int) or not 0 <= sold <= session_total):
+                session["sold"] = _count_sold(data, directory, hall, session_index)
+                session["total"] = session_total
+            hall_sold += session["sold"]
+            hall_total += session["total"]
+        hall["sold"] = hall_sold
+        hall["total"] = hall_total
+        theatre_sold += hall_sold
+        theatre_total += hall_total
+    data["sold"] = theatre_sold
+    data["total"] = theatre_total
+    return data
+
+
+def _schedule_key(start_time):
+    try:
+        return datetime.strptime(start_time, "%Y-%m-%d %H:%M").strftime("%Y-%m-%d %H:%M")
+    except ValueError:
+        return ""
+
+
+def _verify_schedule(data):
+    session_count = sum(len(hall["sessions"]) for hall in data["halls"])
+    if len(data.get("schedule", [])) == session_count:
+        return data
+
+    schedule = []
+    for hall in data["halls"]:
+        for session_index, session in enumerate(hall["sessions"]):
+            schedule.append([_schedule_key(session["start_time"]), hall["number"], session_index])
+    schedule.sort()
+    data["schedule"] = schedule
+    return data
+
+
+def _schedule_index(data):
+    halls = {hall["number"]: hall for hall in data["halls"]}
+    index = []
+    for time_key, hall_number, session_index in data["schedule"]:
+        session = halls[hall_number]["sessions"][session_index]
+        index.append([time_key, hall_number, session_index, session["movie"], session["start_time"],
+                      session["duration"], session["total"] - session["sold"]])
+    return index
+
+
+def _load_theatre_file(filename):
+    if not os.path.exists(filename):
+        return None
+
+    with open(filename, 'rb') as f:
+        data = _decode_theatre(f.read())
+
+    directory = os.path.dirname(filename)
+    if data.get("seat_store") == "mmap":
+        for hall in data["halls"]:
+            if (hall["sessions"] and hall["rows"] * hall["seats_per_row"]
+                    and not os.path.exists(_seat_map_path(directory, data["name"], hall["number"]))):
+                print(f"Файл мест зала №{hall['number']} кинотеатра '{data['name']}' не найден!")
+                return None
+    return _verify_schedule(_verify_counters(data, directory))
+
+
+class EventBus:
+    def __init__(self, log_path=None, queue_size=1000, join_timeout=1.0):
+        self.log_path = log_path
+        self.queue_size = queue_size
+        self.join_timeout = join_timeout
+        self.subscribers = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, handler, event_types=None, queue_size=None):
+        events = queue.Queue(maxsize=queue_size or self.queue_size)
+        stopped = threading.Event()
+        worker = threading.Thread(target=self._dispatch, args=(handler, events, stopped), daemon=True)
+        self.subscribers.append((event_types, events, worker, stopped))
+        worker.start()
+        return events
+
+    def unsubscribe(self, events):
+        for subscriber in self.subscribers:
+            if subscriber[1] is events:
+                self.subscribers.remove(subscriber)
+                _, _, worker, stopped = subscriber
+                stopped.set()
+                try:
+                    events.put_nowait(None)
+                except queue.Full:
+                    pass
+                if worker is not threading.current_thread():
+                    worker.join(self.join_timeout)
+                return True
+        return False
+
+    def close(self):
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber[1])
+
+    def publish(self, event_type, **data):
+        event = Event(event_type, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), MappingProxyType(data))
+
+        if self.log_path:
+            line = json.dumps({"type": event.type, "timestamp": event.timestamp, "data": data},
+                              ensure_ascii=False)
+            with self._lock:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+
+        for event_types, events, _, _ in list(self.subscribers):
+            if event_types and event_type not in event_types:
+                continue
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+        return event
+
+    def _dispatch(self, handler, events, stopped):
+        while True:
+            event = events.get()
+            if event is None or stopped.is_set():
+                break
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"Ошибка обработчика события {event.type}: {e}")
+
+
+class SeatMapStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self._maps = {}
+
+    def add_session(self, theatre_name, hall, seats=None):
+        path = _seat_map_path(self.directory, theatre_name, hall["number"])
+        self._unmap(path)
+        if seats is None:
+            section = bytes(hall["rows"] * hall["seats_per_row"])
+        else:
+            section = b"".join(bytes(row) for row in seats)
+        with open(path, 'ab') as f:
+            f.write(section)
+
+    def session_rows(self, theatre_name, hall, session_index):
+        seats_per_row = hall["seats_per_row"]
+        size = hall["rows"] * seats_per_row
+        if size == 0:
+            return [[] for _ in range(hall["rows"])]
+        view = memoryview(self._map(theatre_name, hall["number"]))[session_index * size:(session_index + 1) * size]
+        return [view[row * seats_per_row:(row + 1) * seats_per_row] for row in range(hall["rows"])]
+
+    def read_session(self, theatre_name, hall, session_index):
+        size = hall["rows"] * hall["seats_per_row"]
+        if size == 0:
+            return [[] for _ in range(hall["rows"])]
+        return _unpack_seats(self._map(theatre_name, hall["number"]), session_index * size,
+                             hall["rows"], hall["seats_per_row"])
+
+    def flush(self, theatre_name, hall_number):
+        path = _seat_map_path(self.directory, theatre_name, hall_number)
+        if path in self._maps:
+            self._maps[path].flush()
+
+    def remove(self, theatre_name, hall_number):
+        path = _seat_map_path(self.directory, theatre_name, hall_number)
+        self._unmap(path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def close(self):
+        for path in list(self._maps):
+            self._unmap(path)
+
+    def _map(self, theatre_name, hall_number):
+        path = _seat_map_path(self.directory, theatre_name, hall_number)
+        if path not in self._maps:
+            with open(path, 'r+b') as f:
+                self._maps[path] = mmap.mmap(f.fileno(), 0)
+        return self._maps[path]
+
+    def _unmap(self, path):
+        seat_map = self._maps.get(path)
+        if seat_map is not None:
+            seat_map.close()
+            del self._maps[path]
+
+
 class CinemaSystem:
-    def __init__(self):
+    def __init__(self, max_workers=None, use_processes=False, storage_format="json", event_log=None,
+                 seat_store="inline"):
+        if storage_format not in STORAGE_FORMATS:
+            raise ValueError(f"Неизвестный формат хранения: {storage_format}")
+        if seat_store not in SEAT_STORES:
+            raise ValueError(f"Неизвестное хранилище мест: {seat_store}")
+
         self.theatres_dir = "theatres"
         self.reports_dir = "reports"
+        self.storage_format = storage_format
+        self.seat_store = seat_store
+        self.seat_maps = SeatMapStore(self.theatres_dir)
+        self.events = EventBus(event_log)
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self._executor = None
         if not os.path.exists(self.theatres_dir):
             os.makedirs(self.theatres_dir)
         if not os.path.exists(self.reports_dir):
@@ -27,36 +381,160 @@ class CinemaSystem:
     def add_theatre(self, name):
         theatre_data = {
             "name": name,
-            "halls": []
+            "halls": [],
+            "storage_format": self.storage_format,
+            "seat_store": self.seat_store,
+            "schedule": [],
+            "sold": 0,
+            "total": 0,
+            "revenue": {"total": 0, "movies": {}, "days": {}, "movie_days": {}}
         }
-        filename = os.path.join(self.theatres_dir, f"{name}.json")
-
-        if os.path.exists(filename):
+        if os.path.exists(self._theatre_filename(name)):
             print(f"Кинотеатр '{name}' уже существует!")
             return False
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(theatre_data, f, ensure_ascii=False, indent=2)
+        self.save_theatre(name, theatre_data)
+        self.events.publish(EVENT_THEATRE_ADDED, theatre=name)
         print(f"Кинотеатр '{name}' успешно добавлен!")
         return True
 
     def get_theatre(self, name):
-        filename = os.path.join(self.theatres_dir, f"{name}.json")
-        if not os.path.exists(filename):
-            return None
-
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _load_theatre_file(self._theatre_filename(name))
 
     def save_theatre(self, name, data):
-        filename = os.path.join(self.theatres_dir, f"{name}.json")
+        storage_format = data.get("storage_format", "json")
+        filename = os.path.join(self.theatres_dir, f"{name}{STORAGE_EXTENSIONS[storage_format]}")
+        with open(filename, 'wb') as f:
+            f.write(_encode_theatre(data, storage_format))
+
+        for extension in set(STORAGE_EXTENSIONS.values()):
+            stale_filename = os.path.join(self.theatres_dir, f"{name}{extension}")
+            if stale_filename != filename and os.path.exists(stale_filename):
+                os.remove(stale_filename)
+
+        self._save_schedule_index(name, data)
+
+    def _save_schedule_index(self, name, data):
+        filename = os.path.join(self.theatres_dir, f"{name}{SCHEDULE_INDEX_EXTENSION}")
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(_schedule_index(_verify_schedule(data)), f, ensure_ascii=False, separators=(',', ':'))
+
+    def _load_schedule_index(self, name):
+        filename = os.path.join(self.theatres_dir, f"{name}{SCHEDULE_INDEX_EXTENSION}")
+        theatre_filename = self._theatre_filename(name)
+        if not os.path.exists(theatre_filename):
+            return None
+
+        if os.path.exists(filename) and os.path.getmtime(filename) >= os.path.getmtime(theatre_filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        theatre = self.get_theatre(name)
+        if not theatre:
+            return None
+        self._save_schedule_index(name, theatre)
+        return _schedule_index(theatre)
+
+    def _theatre_filename(self, name):
+        filename = os.path.join(self.theatres_dir, f"{name}{STORAGE_EXTENSIONS['binary']}")
+        if os.path.exists(filename):
+            return filename
+        return os.path.join(self.theatres_dir, f"{name}{STORAGE_EXTENSIONS['json']}")
+
+    def convert_theatres(self, storage_format=None, seat_store=None):
+        if storage_format is None:
+            storage_format = self.storage_format
+        if storage_format not in STORAGE_FORMATS:
+            print(f"Неизвестный формат хранения: {storage_format}")
+            return 0
+        if seat_store is not None and seat_store not in SEAT_STORES:
+            print(f"Неизвестное хранилище мест: {seat_store}")
+            return 0
+
+        converted = 0
+        for theatre_name in self.list_theatres():
+            theatre = self.get_theatre(theatre_name)
+            current_store = theatre.get("seat_store", "inline")
+            target_store = seat_store or current_store
+
+            if current_store == "inline" and target_store == "mmap":
+                for hall in theatre["halls"]:
+                    self.seat_maps.remove(theatre_name, hall["number"])
+                    for session in hall["sessions"]:
+                        self.seat_maps.add_session(theatre_name, hall, session.pop("seats"))
+            elif current_store == "mmap" and target_store == "inline":
+                for hall in theatre["halls"]:
+                    for session_index, session in enumerate(hall["sessions"]):
+                        session["seats"] = self.seat_maps.read_session(theatre_name, hall, session_index)
+            theatre["seat_store"] = target_store
+            theatre["storage_format"] = storage_format
+            _verify_counters(theatre, self.theatres_dir, recount=True)
+            self.save_theatre(theatre_name, theatre)
+
+            if current_store == "mmap" and target_store == "inline":
+                for hall in theatre["halls"]:
+                    self.seat_maps.remove(theatre_name, hall["number"])
+            converted += 1
+
+        self.storage_format = storage_format
+        if seat_store is not None:
+            self.seat_store = seat_store
+        print(f"Преобразовано кинотеатров: {converted}, формат: {storage_format}, "
+              f"хранилище мест: {seat_store or 'без изменений'}")
+        return converted
+
+    def _session_seats(self, theatre_name, theatre, hall, session_index):
+        if theatre.get("seat_store") == "mmap":
+            return self.seat_maps.session_rows(theatre_name, hall, session_index)
+        return hall["sessions"][session_index]["seats"]
 
     def list_theatres(self):
         files = os.listdir(self.theatres_dir)
-        theatres = [f.replace('.json', '') for f in files if f.endswith('.json')]
-        return theatres
+        extensions = tuple(set(STORAGE_EXTENSIONS.values()))
+        theatres = {os.path.splitext(f)[0] for f in files if f.endswith(extensions)}
+        return sorted(theatres)
+
+    def load_theatres(self, names=None):
+        if names is None:
+            names = self.list_theatres()
+        filenames = [self._theatre_filename(name) for name in names]
+
+        if self.use_processes:
+            executor_class = ProcessPoolExecutor
+        elif self.max_workers and self.max_workers > 1:
+            executor_class = ThreadPoolExecutor
+        else:
+            executor_class = None
+
+        if executor_class is None or len(filenames) < 2:
+            for name, filename in zip(names, filenames):
+                theatre = _load_theatre_file(filename)
+                if theatre:
+                    yield name, theatre
+            return
+
+        if self._executor is None:
+            self._executor = executor_class(max_workers=self.max_workers)
+        in_flight = 2 * (self.max_workers or os.cpu_count() or 1)
+
+        pending = deque()
+        queued = iter(zip(names, filenames))
+        for name, filename in islice(queued, in_flight):
+            pending.append((name, self._executor.submit(_load_theatre_file, filename)))
+        while pending:
+            name, future = pending.popleft()
+            for next_name, next_filename in islice(queued, 1):
+                pending.append((next_name, self._executor.submit(_load_theatre_file, next_filename)))
+            theatre = future.result()
+            if theatre:
+                yield name, theatre
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.events.close()
+        self.seat_maps.close()
 
     def add_hall(self, theatre_name, hall_number, rows, seats_per_row):
         theatre = self.get_theatre(theatre_name)
@@ -73,15 +551,24 @@ class CinemaSystem:
             "number": hall_number,
             "rows": rows,
             "seats_per_row": seats_per_row,
+            "sold": 0,
+            "total": 0,
             "sessions": []
         }
 
         theatre["halls"].append(hall_data)
         self.save_theatre(theatre_name, theatre)
+        self.events.publish(EVENT_HALL_ADDED, theatre=theatre_name, hall=hall_number,
+                            rows=rows, seats_per_row=seats_per_row)
         print(f"Зал №{hall_number} добавлен в кинотеатр '{theatre_name}'!")
         return True
 
-    def create_session(self, theatre_name, hall_number, movie_name, start_time, duration):
+    def create_session(self, theatre_name, hall_number, movie_name, start_time, duration,
+                       base_price=DEFAULT_BASE_PRICE):
+        if base_price <= 0:
+            print("Цена билета должна быть больше нуля!")
+            return False
+
         theatre = self.get_theatre(theatre_name)
         if not theatre:
             print(f"Кинотеатр '{theatre_name}' не найден!")
@@ -97,17 +584,29 @@ class CinemaSystem:
             print(f"Зал №{hall_number} не найден в кинотеатре '{theatre_name}'!")
             return False
 
-        seats = [[False for _ in range(hall["seats_per_row"])] for _ in range(hall["rows"])]
-
         session_data = {
             "movie": movie_name,
             "start_time": start_time,
             "duration": duration,
-            "seats": seats
+            "pricing": _session_pricing(start_time, base_price),
+            "sold": 0,
+            "total": hall["rows"] * hall["seats_per_row"]
         }
 
+        if theatre.get("seat_store") == "mmap":
+            self.seat_maps.add_session(theatre_name, hall)
+        else:
+            session_data["seats"] = [[False for _ in range(hall["seats_per_row"])] for _ in range(hall["rows"])]
+
         hall["sessions"].append(session_data)
+        bisect.insort(theatre["schedule"],
+                      [_schedule_key(start_time), hall_number, len(hall["sessions"]) - 1])
+        hall["total"] += session_data["total"]
+        theatre["total"] += session_data["total"]
         self.save_theatre(theatre_name, theatre)
+        self.events.publish(EVENT_SESSION_CREATED, theatre=theatre_name, hall=hall_number,
+                            session_index=len(hall["sessions"]) - 1, movie=movie_name,
+                            start_time=start_time, duration=duration)
         print(f"Сеанс фильма '{movie_name}' создан на {start_time}!")
         return True
 
@@ -141,36 +640,86 @@ class CinemaSystem:
             print(f"Место {seat + 1} не существует!")
             return False
 
-        if session["seats"][row][seat]:
+        seats = self._session_seats(theatre_name, theatre, hall, session_index)
+        if seats[row][seat]:
             print(f"Место {row + 1}-{seat + 1} уже занято!")
             return False
 
-        session["seats"][row][seat] = True
+        price = self.ticket_price(hall, session, row)
+        seats[row][seat] = True
+        if theatre.get("seat_store") == "mmap":
+            self.seat_maps.flush(theatre_name, hall_number)
+            sold = sum(map(sum, seats))
+        else:
+            sold = session["sold"] + 1
+        hall["sold"] += sold - session["sold"]
+        theatre["sold"] += sold - session["sold"]
+        session["sold"] = sold
+        self._record_revenue(theatre, session, price)
         self.save_theatre(theatre_name, theatre)
+        self.events.publish(EVENT_TICKET_SOLD, theatre=theatre_name, hall=hall_number,
+                            session_index=session_index, movie=session["movie"],
+                            start_time=session["start_time"], row=row, seat=seat, price=price)
         print(f"Билет продан! Кинотеатр: {theatre_name}, Зал: {hall_number}, "
               f"Фильм: {session['movie']}, Время: {session['start_time']}, "
-              f"Место: Ряд {row + 1}, Место {seat + 1}")
+              f"Место: Ряд {row + 1}, Место {seat + 1}, Цена: {price} руб.")
         return True
 
+    def ticket_price(self, hall, session, row):
+        pricing = session.get("pricing") or _session_pricing(session["start_time"])
+
+        zones = pricing["zones"]
+        zone = row * len(zones) // hall["rows"]
+
+        surge = 1.0
+        for threshold, multiplier in SURGE_TIERS:
+            if session["total"] and session["sold"] / session["total"] >= threshold:
+                surge = multiplier
+                break
+
+        return round(pricing["base"] * zones[zone] * pricing["slot"] * surge)
+
+    def _record_revenue(self, theatre, session, price):
+        revenue = theatre.setdefault("revenue", {"total": 0, "movies": {}, "days": {}, "movie_days": {}})
+        movie = session["movie"]
+        day = session["start_time"][:10]
+
+        revenue["total"] += price
+        revenue["movies"][movie] = revenue["movies"].get(movie, 0) + price
+        revenue["days"][day] = revenue["days"].get(day, 0) + price
+        movie_days = revenue["movie_days"].setdefault(movie, {})
+        movie_days[day] = movie_days.get(day, 0) + price
+
+    def get_revenue(self, theatre_name, movie=None, day=None):
+        theatre = self.get_theatre(theatre_name)
+        if not theatre:
+            print(f"Кинотеатр '{theatre_name}' не найден!")
+            return None
+
+        revenue = theatre.get("revenue")
+        if not revenue:
+            return 0
+
+        if movie and day:
+            return revenue["movie_days"].get(movie, {}).get(day, 0)
+        if movie:
+            return revenue["movies"].get(movie, 0)
+        if day:
+            return revenue["days"].get(day, 0)
+        return revenue["total"]
+
     def find_nearest_session(self, movie_name):
         current_time = datetime.now()
         nearest_session = None
         nearest_time = None
         nearest_info = None
 
-        for theatre_name in self.list_theatres():
-            theatre = self.get_theatre(theatre_name)
+        for theatre_name, theatre in self.load_theatres():
 
             for hall in theatre["halls"]:
                 for session_index, session in enumerate(hall["sessions"]):
                     if session["movie"] == movie_name:
-                        has_free_seats = False
-                        for row in session["seats"]:
-                            if False in row:
-                                has_free_seats = True
-                                break
-
-                        if has_free_seats:
+                        if session["sold"] < session["total"]:
                             try:
                                 session_time = datetime.strptime(session["start_time"], "%Y-%m-%d %H:%M")
 
@@ -197,6 +746,47 @@ class CinemaSystem:
             print(f"Сеансы фильма '{movie_name}' со свободными местами не найдены.")
             return None
 
+    def query_sessions(self, movie=None, theatres=None, start=None, end=None,
+                       min_free_seats=1, page=1, page_size=10):
+        if page < 1 or page_size < 1:
+            raise ValueError("Номер и размер страницы должны быть не меньше 1")
+        if start is None:
+            start = datetime.now()
+        start_key = start.strftime("%Y-%m-%d %H:%M")
+        end_key = end.strftime("%Y-%m-%d %H:%M") if end else None
+        movie_prefix = movie.casefold() if movie else None
+
+        def theatre_sessions(theatre_name):
+            schedule = self._load_schedule_index(theatre_name)
+            if schedule is None:
+                return
+
+            for position in range(bisect.bisect_left(schedule, [start_key]), len(schedule)):
+                time_key, hall_number, session_index, movie, start_time, duration, free_seats = schedule[position]
+                if end_key is not None and time_key > end_key:
+                    break
+
+                if movie_prefix and not movie.casefold().startswith(movie_prefix):
+                    continue
+                if free_seats < min_free_seats:
+                    continue
+
+                yield (time_key, theatre_name, hall_number, session_index), {
+                    "theatre": theatre_name,
+                    "hall": hall_number,
+                    "session_index": session_index,
+                    "movie": movie,
+                    "start_time": start_time,
+                    "duration": duration,
+                    "free_seats": free_seats
+                }
+
+        names = sorted(set(theatres)) if theatres is not None else self.list_theatres()
+        streams = [theatre_sessions(theatre_name) for theatre_name in names]
+        merged = heapq.merge(*streams, key=lambda item: item[0])
+        offset = (page - 1) * page_size
+        return [result for _, result in islice(merged, offset, offset + page_size)]
+
     def print_hall_plan(self, theatre_name, hall_number, session_index):
         theatre = self.get_theatre(theatre_name)
         if not theatre:
@@ -231,20 +821,18 @@ class CinemaSystem:
             print(f"{seat_num + 1:3}", end=" ")
         print("\n")
 
-        free_count = 0
-        occupied_count = 0
-
-        for row_num, row in enumerate(session["seats"]):
+        for row_num, row in enumerate(self._session_seats(theatre_name, theatre, hall, session_index)):
             print(f"Ряд {row_num + 1:2} ", end="")
             for seat in row:
                 if seat:
                     print(" X ", end=" ")
-                    occupied_count += 1
                 else:
                     print(" O ", end=" ")
-                    free_count += 1
             print()
 
+        occupied_count = session["sold"]
+        free_count = session["total"] - occupied_count
+
         print(f"\n{'=' * 60}")
         print(f"Обозначения: O - свободно, X - занято")
         print(f"Свободных мест: {free_count}, Занятых мест: {occupied_count}")
@@ -274,8 +862,7 @@ class CinemaSystem:
 
         sessions_found = False
 
-        for theatre_name in self.list_theatres():
-            theatre = self.get_theatre(theatre_name)
+        for theatre_name, theatre in self.load_theatres():
             theatre_sessions = []
 
             for hall in theatre["halls"]:
@@ -345,19 +932,12 @@ class CinemaSystem:
         ws.merge_cells('A1:E1')
         ws.row_dimensions[1].height = 30
 
-        time_intervals = {
-            "Утро (6-12)": (6, 12),
-            "День (12-18)": (12, 18),
-            "Вечер (18-22)": (18, 22),
-            "Ночь (22-6)": (22, 6)
-        }
-
         ws['A3'] = 'Кинотеатр'
         ws['A3'].font = Font(bold=True, size=12)
         ws['A3'].fill = PatternFill(start_color='CCE5FF', end_color='CCE5FF', fill_type='solid')
 
         col = 2
-        for interval_name in time_intervals.keys():
+        for interval_name in TIME_INTERVALS.keys():
             ws.cell(row=3, column=col).value = interval_name
             ws.cell(row=3, column=col).font = Font(bold=True, size=11)
             ws.cell(row=3, column=col).fill = PatternFill(start_color='CCE5FF', end_color='CCE5FF', fill_type='solid')
@@ -367,34 +947,20 @@ class CinemaSystem:
         row = 4
         data_found = False
 
-        for theatre_name in self.list_theatres():
-            theatre = self.get_theatre(theatre_name)
+        for theatre_name, theatre in self.load_theatres():
 
-            occupancy = {interval: {"occupied": 0, "total": 0} for interval in time_intervals.keys()}
+            occupancy = {interval: {"occupied": 0, "total": 0} for interval in TIME_INTERVALS.keys()}
 
             for hall in theatre["halls"]:
                 for session in hall["sessions"]:
                     try:
                         session_time = datetime.strptime(session["start_time"], "%Y-%m-%d %H:%M")
-                        hour = session_time.hour
-
-                        for interval_name, (start_h, end_h) in time_intervals.items():
-                            if start_h < end_h:
-                                if start_h <= hour < end_h:
-                                    interval_key = interval_name
-                                    break
-                            else:
-                                if hour >= start_h or hour < end_h:
-                                    interval_key = interval_name
-                                    break
-                        else:
+                        interval_key = _time_interval(session_time.hour)
+                        if interval_key is None:
                             continue
 
-                        for row_seats in session["seats"]:
-                            for seat in row_seats:
-                                occupancy[interval_key]["total"] += 1
-                                if seat:
-                                    occupancy[interval_key]["occupied"] += 1
+                        occupancy[interval_key]["total"] += session["total"]
+                        occupancy[interval_key]["occupied"] += session["sold"]
 
                         data_found = True
                     except ValueError:
@@ -404,7 +970,7 @@ class CinemaSystem:
             ws.cell(row=row, column=1).font = Font(bold=True)
 
             col = 2
-            for interval_name in time_intervals.keys():
+            for interval_name in TIME_INTERVALS.keys():
                 if occupancy[interval_name]["total"] > 0:
                     percentage = (occupancy[interval_name]["occupied"] / occupancy[interval_name]["total"]) * 100
                     ws.cell(row=row, column=col).value = round(percentage, 1)
@@ -498,8 +1064,7 @@ class CinemaSystem:
 
         sessions_data = []
 
-        for theatre_name in self.list_theatres():
-            theatre = self.get_theatre(theatre_name)
+        for theatre_name, theatre in self.load_theatres():
             theatre_sessions = []
 
             for hall in theatre["halls"]:
@@ -602,6 +1167,9 @@ def main():
         print("8. Сформировать расписание сеансов за месяц (DOCX)")
         print("9. Сформировать график загруженности (XLSX)")
         print("10. Сформировать рекламный буклет фильма (PPTX)")
+        print("11. Преобразовать формат хранения кинотеатров")
+        print("12. Показать выручку кинотеатра")
+        print("13. Поиск сеансов")
         print("0. Выход")
         print("=" * 60)
 
@@ -659,7 +1227,9 @@ def main():
                 movie = input("Введите название фильма: ").strip()
                 start_time = input("Введите время начала (ГГГГ-ММ-ДД ЧЧ:ММ): ").strip()
                 duration = int(input("Введите длительность фильма (в минутах): "))
-                system.create_session(theatre_name, hall_number, movie, start_time, duration)
+                base_price = input(f"Введите базовую цену билета (по умолчанию {DEFAULT_BASE_PRICE}): ").strip()
+                base_price = int(base_price) if base_price else DEFAULT_BASE_PRICE
+                system.create_session(theatre_name, hall_number, movie, start_time, duration, base_price)
             except ValueError:
                 print("Ошибка! Проверьте формат введённых данных.")
 
@@ -776,8 +1346,7 @@ def main():
             if not theatres:
                 print("Кинотеатры не найдены.")
             else:
-                for theatre_name in theatres:
-                    theatre = system.get_theatre(theatre_name)
+                for theatre_name, theatre in system.load_theatres(theatres):
                     print(f"\nКинотеатр: {theatre_name}")
                     print(f"Количество залов: {len(theatre['halls'])}")
                     for hall in theatre["halls"]:
@@ -806,8 +1375,64 @@ def main():
             else:
                 print("Название фильма не может быть пустым!")
 
+        elif choice == "11":
+            print("\n--- ПРЕОБРАЗОВАНИЕ ФОРМАТА ХРАНЕНИЯ ---")
+            print("Доступные форматы:", ", ".join(STORAGE_FORMATS))
+            storage_format = input("Введите формат: ").strip()
+            print("Доступные хранилища мест:", ", ".join(SEAT_STORES))
+            seat_store = input("Введите хранилище мест (Enter — без изменений): ").strip() or None
+            system.convert_theatres(storage_format, seat_store)
+
+        elif choice == "12":
+            print("\n--- ВЫРУЧКА КИНОТЕАТРА ---")
+            theatres = system.list_theatres()
+            if not theatres:
+                print("Сначала добавьте хотя бы один кинотеатр!")
+                continue
+
+            print("Доступные кинотеатры:", ", ".join(theatres))
+            theatre_name = input("Введите название кинотеатра: ").strip()
+            movie = input("Введите название фильма (Enter — все фильмы): ").strip() or None
+            day = input("Введите дату сеансов ГГГГ-ММ-ДД (Enter — все дни): ").strip() or None
+
+            revenue = system.get_revenue(theatre_name, movie, day)
+            if revenue is not None:
+                print(f"Выручка: {revenue} руб.")
+
+        elif choice == "13":
+            print("\n--- ПОИСК СЕАНСОВ ---")
+            movie = input("Введите начало названия фильма (Enter — все фильмы): ").strip() or None
+            theatres = input("Введите кинотеатры через запятую (Enter — все): ").strip()
+            theatres = [name.strip() for name in theatres.split(",") if name.strip()] or None
+
+            try:
+                start = input("Начало периода ГГГГ-ММ-ДД ЧЧ:ММ (Enter — сейчас): ").strip()
+                start = datetime.strptime(start, "%Y-%m-%d %H:%M") if start else None
+                end = input("Конец периода ГГГГ-ММ-ДД ЧЧ:ММ (Enter — без ограничения): ").strip()
+                end = datetime.strptime(end, "%Y-%m-%d %H:%M") if end else None
+                min_free_seats = input("Минимум свободных мест (по умолчанию 1): ").strip()
+                min_free_seats = int(min_free_seats) if min_free_seats else 1
+                page = input("Номер страницы (по умолчанию 1): ").strip()
+                page = int(page) if page else 1
+            except ValueError:
+                print("Ошибка! Проверьте формат введённых данных.")
+                continue
+
+            if page < 1:
+                print("Номер страницы должен быть не меньше 1!")
+                continue
+
+            results = system.query_sessions(movie, theatres, start, end, min_free_seats, page)
+            if not results:
+                print("Сеансы не найдены.")
+            for result in results:
+                print(f"{result['start_time']} | {result['movie']} | Кинотеатр: {result['theatre']}, "
+                      f"Зал: {result['hall']}, Сеанс: {result['session_index']} | "
+                      f"Свободных мест: {result['free_seats']}")
+
         elif choice == "0":
             print("\nСпасибо за использование билетной системы! До свидания!")
+            system.close()
             break
 
         else: